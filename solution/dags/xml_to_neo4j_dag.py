@@ -29,43 +29,19 @@ dag = DAG(
     catchup=False,
 )
 
-# Task to parse the XML file and create a graph
-def parse_xml_to_graph(**kwargs):
-    parser = XMLGraphParser(input_xml_path)
-    graph = parser.parse()
-    kwargs['ti'].xcom_push(key='graph', value=graph)
-
-parse_xml_task = PythonOperator(
-    task_id='parse_xml_to_graph',
-    python_callable=parse_xml_to_graph,
-    provide_context=True,
-    dag=dag,
-)
-
-# Task to export the graph to GEXF format
-def export_graphs(**kwargs):
-    graph = kwargs['ti'].xcom_pull(key='graph')
-    export_graph_gexf(graph, output_gexf_path)
-
-export_graphs_task = PythonOperator(
-    task_id='export_graphs',
-    python_callable=export_graphs,
-    provide_context=True,
-    dag=dag,
-)
-
-# Task to import the graph to Neo4j
-def import_graph_to_neo4j(**kwargs):
-    graph = kwargs['ti'].xcom_pull(key='graph')
+# Task to parse the XML file into a graph, export it to GEXF format and import it to Neo4j.
+# The three steps run in the same process so the graph stays in memory instead of going through XCom.
+# Only the path of the GEXF file is returned, which the operator pushes as the `return_value` XCom.
+def process_file(xml_path, gexf_path):
+    graph = XMLGraphParser(xml_path).parse()
+    export_graph_gexf(graph, gexf_path)
     neo4j = Neo4J()
-    neo4j.import_to_neo4j(graph, export_graph_gexf, method='gefx')
+    neo4j.import_to_neo4j(graph)
+    return gexf_path
 
-import_to_neo4j_task = PythonOperator(
-    task_id='import_graph_to_neo4j',
-    python_callable=import_graph_to_neo4j,
-    provide_context=True,
+process_file_task = PythonOperator(
+    task_id='process_file',
+    python_callable=process_file,
+    op_kwargs={'xml_path': input_xml_path, 'gexf_path': output_gexf_path},
     dag=dag,
 )
-
-# Set task order
-parse_xml_task >> export_graphs_task >> import_to_neo4j_task
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import networkx as nx
+from utils.graph_utils import _pagerank, export_graph_gexf
+from utils.xml_graph_parser import XMLGraphParser
+
+# Sample UniProt entry shipped with the repository
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'Q9Y261.xml')
+
+
+class TestPageRank(unittest.TestCase):
+    """
+    Checks the Numba power iteration against the PageRank computed by NetworkX.
+    """
+
+    def test_pagerank_matches_networkx(self) -> None:
+        graph = XMLGraphParser(SAMPLE_XML).parse()
+
+        expected = nx.pagerank(graph.to_networkx())
+        pagerank = _pagerank(graph.to_csr())
+
+        np.testing.assert_allclose(pagerank, [expected[node_id] for node_id in range(len(graph.node_name))], rtol=1e-9)
+        self.assertAlmostEqual(pagerank.sum(), 1.0)
+
+
+class TestWriteGexf(unittest.TestCase):
+    """
+    Checks that the streamed GEXF output reads back with NetworkX as the exported graph.
+    """
+
+    def setUp(self) -> None:
+        fd, self.gexf_file = tempfile.mkstemp(suffix='.gexf')
+        os.close(fd)
+
+
+    def tearDown(self) -> None:
+        os.remove(self.gexf_file)
+
+
+    def test_round_trip(self) -> None:
+        graph = XMLGraphParser(SAMPLE_XML).parse()
+        export_graph_gexf(graph, self.gexf_file)
+
+        read = nx.read_gexf(self.gexf_file)
+
+        self.assertTrue(read.is_directed())
+        self.assertEqual(read.number_of_nodes(), len(graph.node_name))
+        self.assertEqual(read.number_of_edges(), len(graph.src))
+        for node_id, (name, attributes) in enumerate(zip(graph.node_name, graph.node_attr)):
+            node = read.nodes[str(node_id)]
+            self.assertEqual(node['label'], name)
+            self.assertAlmostEqual(node['pagerank'], attributes['pagerank'])
+        for source, target, attributes in zip(graph.src.tolist(), graph.dst.tolist(), graph.edge_attr):
+            self.assertEqual(read.edges[str(source), str(target)]['attr'], attributes['attr'])
+        self.assertFalse(read.has_edge(str(graph.dst[0]), str(graph.src[0])))
@@ -0,0 +1,92 @@
+import os
+import copy
+import tempfile
+import unittest
+from lxml import etree as LET
+from utils.xml_graph_parser import XMLGraphParser
+
+# Sample UniProt entry shipped with the repository
+SAMPLE_XML = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'Q9Y261.xml')
+
+
+class TestXMLGraphParser(unittest.TestCase):
+    """
+    Checks that parsing with several worker processes yields the same graph as parsing in a single process.
+    """
+
+    def setUp(self) -> None:
+        """
+        Write a multi-entry file built from the sample entry: copies with their own accessions and a varying subset of
+        its references, so that references and authors are shared across chunks, plus two untitled submissions to the
+        same database in the same month with different authors.
+        """
+
+        tree = LET.parse(SAMPLE_XML)
+        root = tree.getroot()
+        entry = root.find(XMLGraphParser._TAG_ENTRY)
+        for copy_index in range(1, 6):
+            entry_copy = copy.deepcopy(entry)
+            next(entry_copy.iterchildren(XMLGraphParser._TAG_ACCESSION)).text = f'QCOPY{copy_index}'
+            for ref_index, ref in enumerate(list(entry_copy.iterchildren(XMLGraphParser._TAG_REFERENCE))):
+                if ref_index % copy_index:
+                    entry_copy.remove(ref)
+            root.append(entry_copy)
+
+        for accession, authors in (('QSUB1', ['NIEHS SNPs program']), ('QSUB2', ['Smith J.', 'Doe A.'])):
+            submission = LET.SubElement(root, XMLGraphParser._TAG_ENTRY)
+            LET.SubElement(submission, XMLGraphParser._TAG_ACCESSION).text = accession
+            citation = LET.SubElement(
+                LET.SubElement(submission, XMLGraphParser._TAG_REFERENCE),
+                XMLGraphParser._TAG_CITATION,
+                type='submission', date='2005-10', db='EMBL/GenBank/DDBJ databases',
+            )
+            author_list = LET.SubElement(citation, XMLGraphParser._TAG_AUTHOR_LIST)
+            for author in authors:
+                LET.SubElement(author_list, XMLGraphParser._NS + 'person', name=author)
+
+        fd, self.xml_file = tempfile.mkstemp(suffix='.xml')
+        os.close(fd)
+        tree.write(self.xml_file)
+
+
+    def tearDown(self) -> None:
+        os.remove(self.xml_file)
+
+
+    def test_parallel_matches_single_process(self) -> None:
+        expected = XMLGraphParser(self.xml_file).parse()
+
+        parser = XMLGraphParser(self.xml_file, processes=2)
+        parser.bytes_per_chunk = 1
+        graph = parser.parse()
+
+        self.assertEqual(graph.node_name, expected.node_name)
+        self.assertEqual(graph.node_attr, expected.node_attr)
+        self.assertEqual(graph.src.tolist(), expected.src.tolist())
+        self.assertEqual(graph.dst.tolist(), expected.dst.tolist())
+        self.assertEqual(graph.edge_attr, expected.edge_attr)
+
+
+    def test_untitled_submissions_are_not_merged(self) -> None:
+        graph = XMLGraphParser(self.xml_file).parse()
+
+        authors = {attributes['author_name'] for attributes in graph.node_attr if 'author_name' in attributes}
+        self.assertTrue({'NIEHS SNPs program', 'Smith J.', 'Doe A.'} <= authors)
+
+
+    def test_external_entities_are_not_resolved(self) -> None:
+        fd, secret_file = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as secret:
+            secret.write('SECRET')
+        with open(self.xml_file, 'w') as xml:
+            xml.write(
+                f'<!DOCTYPE uniprot [<!ENTITY secret SYSTEM "file://{secret_file}">]>'
+                '<uniprot xmlns="http://uniprot.org/uniprot"><entry><accession>&secret;</accession></entry></uniprot>'
+            )
+
+        try:
+            for processes in (1, 2):
+                graph = XMLGraphParser(self.xml_file, processes=processes).parse()
+                self.assertNotIn('SECRET', [attributes['accession'] for attributes in graph.node_attr])
+        finally:
+            os.remove(secret_file)
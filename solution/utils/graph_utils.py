@@ -1,35 +1,264 @@
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
+from lxml import etree as LET
+from numba import njit, prange
+from utils.xml_graph_parser import GraphArrays
 
-def plot_graph(graph: nx.Graph) -> None:
+# igraph is optional: when installed, PageRank is computed by its C core instead of the Numba power iteration
+try:
+    import igraph
+except ImportError:
+    igraph = None
+
+# GEXF 1.2 namespace, declared as the default namespace of the written documents
+_GEXF_NS = 'http://www.gexf.net/1.2draft'
+
+def plot_graph(graph: GraphArrays) -> None:
     """
-    Plots the provided graph using the `networkx` and `matplotlib` libraries. The method draws the nodes and edges of the
-    graph and shows the plot on the screen.
+    Plots the provided graph using the `networkx` and `matplotlib` libraries. The method converts the graph to a
+    `networkx` graph, draws its nodes and edges and shows the plot on the screen.
 
     Args:
-        graph (nx.Graph): A `networkx` graph object to be plotted.
+        graph (GraphArrays): The graph to be plotted.
 
     Returns:
         None
     """
     
-    nx.draw(graph, with_labels=True)
+    nx.draw(graph.to_networkx(), with_labels=True)
     plt.show()
-    
-def export_graph_gexf(graph: nx.Graph, file_name:str) -> None:
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _pagerank_numba(indptr, indices, data, dangling, alpha, max_iter, tol):
+    """
+    Runs the PageRank power iteration in native code. The matrix given in CSR form holds, for each node, its incoming
+    edges weighted by the inverse out-degree of their source, so each row is reduced independently across threads.
+
+    Args:
+        indptr (np.ndarray): The row pointers of the transposed, normalized adjacency matrix.
+        indices (np.ndarray): The column indices of the transposed, normalized adjacency matrix.
+        data (np.ndarray): The values of the transposed, normalized adjacency matrix.
+        dangling (np.ndarray): A boolean mask of the nodes without outgoing edges.
+        alpha (float): The damping factor.
+        max_iter (int): The maximum number of power iterations.
+        tol (float): The error tolerance used to check convergence, scaled by the number of nodes.
+
+    Returns:
+        tuple: The PageRank of each node and whether the power iteration converged.
+    """
+
+    n = indptr.shape[0] - 1
+    x = np.full(n, 1.0 / n)
+    x_next = np.empty(n)
+    for _ in range(max_iter):
+        dangling_sum = 0.0
+        for i in prange(n):
+            if dangling[i]:
+                dangling_sum += x[i]
+        teleport = (alpha * dangling_sum + 1.0 - alpha) / n
+
+        err = 0.0
+        for i in prange(n):
+            rank = 0.0
+            for k in range(indptr[i], indptr[i + 1]):
+                rank += data[k] * x[indices[k]]
+            x_next[i] = alpha * rank + teleport
+            err += abs(x_next[i] - x[i])
+
+        x, x_next = x_next, x
+        if err < n * tol:
+            return x, True
+    return x, False
+
+
+def _pagerank(adjacency, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> np.ndarray:
+    """
+    Computes the PageRank of every node of a graph by power iteration over its sparse adjacency matrix. The matrix is
+    normalized and transposed once, and the iteration itself is JIT-compiled with Numba (`_pagerank_numba`). Dangling
+    nodes (without outgoing edges) spread their rank uniformly over all nodes, as in `nx.pagerank`.
+
+    Args:
+        adjacency (scipy.sparse.csr_array): The weighted adjacency matrix of the graph, in CSR format.
+        alpha (float): The damping factor.
+        max_iter (int): The maximum number of power iterations.
+        tol (float): The error tolerance used to check convergence, scaled by the number of nodes.
+
+    Returns:
+        np.ndarray: The PageRank of each node, in the row order of `adjacency`.
+
+    Raises:
+        nx.PowerIterationFailedConvergence: If the power iteration does not converge within `max_iter` iterations.
+    """
+
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.empty(0)
+
+    # Normalize each row by its out-degree, in place on the CSR data
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inv_out_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    adjacency = adjacency.astype(np.float64)
+    adjacency.data *= np.repeat(inv_out_degree, np.diff(adjacency.indptr))
+
+    # Rows of the transposed matrix hold the incoming edges of each node
+    incoming = adjacency.T.tocsr()
+    x, converged = _pagerank_numba(incoming.indptr, incoming.indices, incoming.data, dangling, alpha, max_iter, tol)
+    if not converged:
+        raise nx.PowerIterationFailedConvergence(max_iter)
+    return x
+
+
+def _pagerank_igraph(graph: GraphArrays, alpha: float = 0.85) -> np.ndarray:
+    """
+    Computes the PageRank of every node of a graph with igraph, whose C core solves it with PRPACK. Parallel edges are
+    kept as distinct edges, which weights them the same way as the summed entries of `GraphArrays.to_csr`, and dangling
+    nodes spread their rank uniformly over all nodes, as in `_pagerank`.
+
+    Args:
+        graph (GraphArrays): The graph to be ranked.
+        alpha (float): The damping factor.
+
+    Returns:
+        np.ndarray: The PageRank of each node, indexed by node id.
+    """
+
+    edges = list(zip(graph.src.tolist(), graph.dst.tolist()))
+    graph_ig = igraph.Graph(n=len(graph.node_name), edges=edges, directed=True)
+    return np.asarray(graph_ig.pagerank(damping=alpha, directed=True))
+
+
+def _gexf_type(value) -> str:
+    """
+    Maps a Python attribute value to the matching GEXF attribute type.
+
+    Args:
+        value: An attribute value of a node or an edge.
+
+    Returns:
+        str: The GEXF type of the value.
+    """
+
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'long'
+    if isinstance(value, float):
+        return 'double'
+    return 'string'
+
+
+def _write_gexf_attributes(xf: LET.xmlfile, attr_class: str, attr_types: dict) -> None:
+    """
+    Writes the declaration of the node or edge attributes of a GEXF file.
+
+    Args:
+        xf (LET.xmlfile): The incremental writer of the GEXF file.
+        attr_class (str): The class of the attributes, `node` or `edge`.
+        attr_types (dict): A dictionary mapping each attribute title to its GEXF type.
+
+    Returns:
+        None
+    """
+
+    attributes = LET.Element('attributes', {'class': attr_class, 'mode': 'static'})
+    for title, attr_type in attr_types.items():
+        LET.SubElement(attributes, 'attribute', id=title, title=title, type=attr_type)
+    xf.write(attributes)
+
+
+def _write_gexf_element(xf: LET.xmlfile, tag: str, attrib: dict, data: dict) -> None:
+    """
+    Writes a single node or edge of a GEXF file, with its attribute values, and releases it right away.
+
+    Args:
+        xf (LET.xmlfile): The incremental writer of the GEXF file.
+        tag (str): The tag of the element, `node` or `edge`.
+        attrib (dict): The XML attributes of the element (id, label, source, target).
+        data (dict): The attributes of the node or edge in the graph.
+
+    Returns:
+        None
+    """
+
+    element = LET.Element(tag, attrib)
+    if data:
+        attvalues = LET.SubElement(element, 'attvalues')
+        for key, value in data.items():
+            if value is not None:
+                LET.SubElement(attvalues, 'attvalue', {'for': key, 'value': str(value)})
+    xf.write(element)
+
+
+def write_gexf(graph: GraphArrays, file_name: str) -> None:
+    """
+    Writes the provided graph to a file in the GEXF 1.2 format. Unlike `nx.write_gexf`, which builds the whole document
+    in memory before serializing it, the nodes and edges are written one at a time with `lxml.etree.xmlfile`, so the
+    memory used by the writer does not grow with the size of the graph. The attributes are declared using their titles
+    as ids, and each node is labelled with its `name` attribute.
+
+    Args:
+        graph (GraphArrays): The graph to be written.
+        file_name (str): A string representing the name of the output file.
+
+    Returns:
+        None
+    """
+
+    # Attributes have to be declared before the nodes and edges that use them
+    node_types = {'name': 'string'}
+    for data in graph.node_attr:
+        for key, value in data.items():
+            if key not in node_types and value is not None:
+                node_types[key] = _gexf_type(value)
+    edge_types = {}
+    for data in graph.edge_attr:
+        for key, value in data.items():
+            if key not in edge_types and value is not None:
+                edge_types[key] = _gexf_type(value)
+
+    with LET.xmlfile(file_name, encoding='utf-8') as xf:
+        xf.write_declaration()
+        with xf.element('gexf', xmlns=_GEXF_NS, version='1.2'):
+            with xf.element('graph', defaultedgetype='directed', mode='static'):
+                _write_gexf_attributes(xf, 'node', node_types)
+                _write_gexf_attributes(xf, 'edge', edge_types)
+
+                with xf.element('nodes'):
+                    for node_id, (name, data) in enumerate(zip(graph.node_name, graph.node_attr)):
+                        _write_gexf_element(xf, 'node', {'id': str(node_id), 'label': name}, {'name': name, **data})
+
+                with xf.element('edges'):
+                    for edge_id, (source, target, data) in enumerate(
+                        zip(graph.src.tolist(), graph.dst.tolist(), graph.edge_attr)
+                    ):
+                        _write_gexf_element(
+                            xf, 'edge', {'id': str(edge_id), 'source': str(source), 'target': str(target)}, data
+                        )
+
+
+def export_graph_gexf(graph: GraphArrays, file_name:str) -> None:
     """
-    Exports the provided graph to a file in the GEXF format using the `networkx` library. The method writes the graph to
-    the specified file in the GEXF format, which can be read by many graph visualization tools.
+    Exports the provided graph to a file in the GEXF format. The PageRank of each node is computed with igraph when it
+    is installed, or otherwise on the sparse adjacency matrix built from the edge arrays of the graph with a
+    Numba-compiled power iteration, and stored as its `pagerank` attribute. The method then streams the graph to the
+    specified file in the GEXF format with `write_gexf`, which can be read by many graph visualization tools.
 
     Args:
-        graph (nx.Graph): A `networkx` graph object to be exported.
+        graph (GraphArrays): The graph to be exported.
         file_name (str): A string representing the name of the output file.
 
     Returns:
         None
     """
 
-    graph_metric = nx.pagerank(graph, weight='weight')
-    nx.set_node_attributes(graph, graph_metric, 'pagerank')
-    nx.write_gexf(graph, file_name)
+    if igraph is not None:
+        graph_metric = _pagerank_igraph(graph)
+    else:
+        graph_metric = _pagerank(graph.to_csr())
+    for attributes, pagerank in zip(graph.node_attr, graph_metric.tolist()):
+        attributes['pagerank'] = pagerank
+    write_gexf(graph, file_name)
 
@@ -1,70 +1,240 @@
 import os
-import py2neo
-import networkx as nx
-from py2neo import (Graph, Node, Relationship)
+import csv
+import uuid
+import itertools
+from typing import Iterable, Iterator
+from neo4j import Driver, GraphDatabase, ManagedTransaction
+from utils.xml_graph_parser import GraphArrays
+
+# Driver shared by every Neo4J instance of the process, created on first use
+_DRIVER = None
+
+
+def get_driver() -> Driver:
+    """
+    Return the Neo4j driver of the process, creating it from the connection details in the environment the first time.
+    The driver keeps a pool of Bolt connections, so they are reused across Neo4J instances and imports.
+
+    :return: A neo4j Driver object.
+    """
+
+    global _DRIVER
+    if _DRIVER is None:
+        neo4j_url = os.getenv('NEO4J_URL')
+        neo4j_user = os.getenv('NEO4J_USER')
+        neo4j_password = os.getenv('NEO4J_PASSWORD')
+        _DRIVER = GraphDatabase.driver(neo4j_url, auth=(neo4j_user, neo4j_password), max_connection_pool_size=50)
+    return _DRIVER
 
 
 class Neo4J:
     """
-    A class to interact with Neo4j graph database using py2neo library.
+    A class to interact with Neo4j graph database using the official neo4j Python driver.
     """
 
+    # Number of nodes or relationships sent to Neo4j in a single UNWIND query
+    batch_size = 10000
+
+    # Cypher functions converting back the CSV columns of non-string properties, by Python type
+    _csv_casts = {bool: 'toBoolean', int: 'toInteger', float: 'toFloat'}
+
     def __init__(self) -> None:
         """
-        Initialize Neo4j graph instance with connection details.
+        Initialize Neo4j instance with the shared driver of the process.
+        """
+
+        self.driver = get_driver()
+
+        # Local path of the Neo4j `import` directory, read by LOAD CSV through `file:///` URLs
+        self.import_dir = os.getenv('NEO4J_IMPORT_DIR')
+
+
+    def batches(self, rows: Iterable[dict]) -> Iterator[list]:
+        """
+        Split the given rows into lists of at most `batch_size` rows, without materializing them all at once.
+
+        :param rows: An iterable of rows to be sent to Neo4j.
+        :return: An iterator over lists of rows.
+        """
+
+        rows = iter(rows)
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            yield batch
+
+
+    @staticmethod
+    def _run_batch(tx: ManagedTransaction, query: str, rows: list, load_id: str) -> None:
+        """
+        Run an UNWIND query over a batch of rows inside a write transaction.
+
+        :param tx: The transaction managed by the driver.
+        :param query: The Cypher query, reading the batch from the `$rows` parameter and the load from `$load_id`.
+        :param rows: The batch of rows.
+        :param load_id: The id of the load the rows belong to.
         """
-        
-        neo4j_url = os.getenv('NEO4J_URL')
-        neo4j_user = os.getenv('NEO4J_USER')
-        neo4j_password = os.getenv('NEO4J_PASSWORD')
-        self.graph_4j = Graph(neo4j_url, auth=(neo4j_user, neo4j_password))
-        
 
-    def create_neo4j_node(self, node: py2neo.Node) -> py2neo.Node:
+        tx.run(query, rows=rows, load_id=load_id).consume()
+
+
+    def create_neo4j_nodes(self, graph: GraphArrays, load_id: str) -> None:
+        """
+        Create a `Node` labelled node in Neo4j for every node of the given graph, one UNWIND query per batch. The
+        index of the node in the graph arrays is stored as the `nid` property and the id of the load as the `load_id`
+        property, so relationships can be matched against the nodes of this load only.
+
+        :param graph: The graph, as returned by XMLGraphParser.parse.
+        :param load_id: The id of the load, unique across imports.
+        """
+
+        query = "UNWIND $rows AS row CREATE (n:Node {load_id: $load_id, nid: row.nid}) SET n += row.props"
+        rows = (
+            {'nid': node_id, 'props': {'name': name, **properties}}
+            for node_id, (name, properties) in enumerate(zip(graph.node_name, graph.node_attr))
+        )
+        with self.driver.session() as session:
+            for batch in self.batches(rows):
+                session.execute_write(self._run_batch, query, batch, load_id)
+
+
+    def create_neo4j_relationships(self, graph: GraphArrays, load_id: str) -> None:
+        """
+        Create a `CONNECTED_TO` relationship in Neo4j for every edge of the given graph, one UNWIND query per batch.
+        Source and target nodes are looked up by their `load_id` and `nid` properties.
+
+        :param graph: The graph, as returned by XMLGraphParser.parse.
+        :param load_id: The id of the load the nodes were created with.
+        """
+
+        query = (
+            "UNWIND $rows AS row "
+            "MATCH (source:Node {load_id: $load_id, nid: row.source}), "
+            "(target:Node {load_id: $load_id, nid: row.target}) "
+            "CREATE (source)-[r:CONNECTED_TO]->(target) SET r += row.props"
+        )
+        rows = (
+            {'source': source, 'target': target, 'props': dict(properties)}
+            for source, target, properties in zip(graph.src.tolist(), graph.dst.tolist(), graph.edge_attr)
+        )
+        with self.driver.session() as session:
+            for batch in self.batches(rows):
+                session.execute_write(self._run_batch, query, batch, load_id)
+
+
+    def _set_casts(self, variable: str, rows: Iterable[dict]) -> str:
         """
-        Create a py2neo Node object with given properties.
+        Build the Cypher SET items converting back the CSV columns of the numeric and boolean properties found in the
+        given rows, which LOAD CSV would otherwise store as strings.
 
-        :param node: A tuple containing the node id and its properties as a dictionary.
-        :return: A py2neo Node object with given properties.
+        :param variable: The Cypher variable of the node or relationship being loaded.
+        :param rows: The properties of the nodes or relationships written to the CSV file.
+        :return: The SET items, each preceded by a comma.
         """
 
-        label = 'Node'
-        properties = dict(node)
-        return Node(label, **properties)
+        casts = {}
+        for properties in rows:
+            for key, value in properties.items():
+                if key not in casts and type(value) in self._csv_casts:
+                    casts[key] = self._csv_casts[type(value)]
+        return ''.join(f", {variable}.`{key}` = {cast}(row.`{key}`)" for key, cast in casts.items())
 
-    
-    def create_neo4j_relationship(self, source, target, edge) -> py2neo.Relationship:
+
+    def _dump_csv(self, graph: GraphArrays, nodes_path: str, edges_path: str) -> None:
+        """
+        Write the nodes and edges of the given graph to two CSV files, one row at a time. The nodes file has a `nid`
+        column followed by one column per node attribute, and the edges file has `source` and `target` columns followed
+        by one column per edge attribute.
+
+        :param graph: The graph, as returned by XMLGraphParser.parse.
+        :param nodes_path: The path of the nodes CSV file.
+        :param edges_path: The path of the edges CSV file.
+        """
+
+        node_fields = sorted({key for properties in graph.node_attr for key in properties})
+        with open(nodes_path, 'w', newline='') as nodes_file:
+            writer = csv.DictWriter(nodes_file, fieldnames=['nid', 'name', *node_fields])
+            writer.writeheader()
+            for node_id, (name, properties) in enumerate(zip(graph.node_name, graph.node_attr)):
+                writer.writerow({'nid': node_id, 'name': name, **properties})
+
+        edge_fields = sorted({key for properties in graph.edge_attr for key in properties})
+        with open(edges_path, 'w', newline='') as edges_file:
+            writer = csv.DictWriter(edges_file, fieldnames=['source', 'target', *edge_fields])
+            writer.writeheader()
+            for source, target, properties in zip(graph.src.tolist(), graph.dst.tolist(), graph.edge_attr):
+                writer.writerow({'source': source, 'target': target, **properties})
+
+
+    def load_neo4j_csv(self, graph: GraphArrays, load_id: str) -> None:
         """
-        Create a py2neo Relationship object with given properties.
+        Dump the given graph as CSV files into the Neo4j import directory and load them with LOAD CSV, committing every
+        `batch_size` rows. This skips the round-trips of the UNWIND batches and is the fastest way to do an initial load.
+        CSV values are read back by Neo4j as strings, so the `nid` property and the numeric and boolean properties (such
+        as `pagerank`) are converted back, giving them the same types as with the UNWIND import. As with the UNWIND
+        import, nodes are tagged with the id of the load and relationships are only matched against the nodes of it.
 
-        :param source: A py2neo Node object representing the source node.
-        :param target: A py2neo Node object representing the target node.
-        :param edge: A tuple containing the edge attributes as a dictionary.
-        :return: A py2neo Relationship object with given properties.
+        :param graph: The graph, as returned by XMLGraphParser.parse.
+        :param load_id: The id of the load, unique across imports.
         """
 
-        rel_type = 'CONNECTED_TO'
-        properties = dict(edge)
-        return Relationship(source, rel_type, target, **properties)
+        if self.import_dir is None:
+            raise ValueError("NEO4J_IMPORT_DIR must be set to load the graph from CSV files")
+
+        self._dump_csv(
+            graph,
+            os.path.join(self.import_dir, 'nodes.csv'),
+            os.path.join(self.import_dir, 'edges.csv'),
+        )
+
+        # CALL { ... } IN TRANSACTIONS commits by itself, so it has to run in an auto-commit transaction
+        with self.driver.session() as session:
+            session.run(
+                "LOAD CSV WITH HEADERS FROM $url AS row "
+                "CALL { WITH row CREATE (n:Node) SET n += row, n.load_id = $load_id, n.nid = toInteger(row.nid)"
+                f"{self._set_casts('n', graph.node_attr)} }} "
+                f"IN TRANSACTIONS OF {self.batch_size} ROWS",
+                url='file:///nodes.csv',
+                load_id=load_id,
+            ).consume()
+            session.run(
+                "LOAD CSV WITH HEADERS FROM $url AS row "
+                "CALL { WITH row "
+                "MATCH (source:Node {load_id: $load_id, nid: toInteger(row.source)}), "
+                "(target:Node {load_id: $load_id, nid: toInteger(row.target)}) "
+                f"CREATE (source)-[r:CONNECTED_TO]->(target) SET r += row{self._set_casts('r', graph.edge_attr)} "
+                "REMOVE r.source, r.target } "
+                f"IN TRANSACTIONS OF {self.batch_size} ROWS",
+                url='file:///edges.csv',
+                load_id=load_id,
+            ).consume()
+
 
-    
-    def import_to_neo4j(self, graph_nx: nx.Graph) -> None:
+    def import_to_neo4j(self, graph: GraphArrays, method: str = 'csv') -> None:
         """
-        Import a NetworkX graph into a Neo4j graph database.
+        Import a graph parsed by XMLGraphParser into a Neo4j graph database. Every import gets its own load id, stored
+        on its nodes, so the graphs loaded by successive runs are never linked to each other.
 
-        :param graph_nx: A NetworkX Graph or DiGraph object.
+        :param graph: The graph, as returned by XMLGraphParser.parse.
+        :param method: `csv` to load the graph through CSV files and LOAD CSV (initial loads), or `unwind` to send it in
+            batched UNWIND queries.
         """
 
+        if method not in ('csv', 'unwind'):
+            raise ValueError(f"Unknown import method: {method}")
+
+        # Node ids restart from 0 on every import, so they are only unique within a load. The constraint indexes the
+        # keys used to match the relationships endpoints and makes any collision fail the import.
+        with self.driver.session() as session:
+            session.run(
+                "CREATE CONSTRAINT node_load_nid IF NOT EXISTS FOR (n:Node) REQUIRE (n.load_id, n.nid) IS UNIQUE"
+            ).consume()
+        load_id = uuid.uuid4().hex
+
+        if method == 'csv':
+            self.load_neo4j_csv(graph, load_id)
+            return
+
         # Create nodes
-        node_mapping = {}
-        for node in graph_nx.nodes(data=True):
-            n = self.create_neo4j_node(node[1])
-            node_mapping[node[0]] = n
-            self.graph_4j.create(n)
+        self.create_neo4j_nodes(graph, load_id)
 
         # Create relationships
-        for edge in graph_nx.edges(data=True):
-            source = node_mapping[edge[0]]
-            target = node_mapping[edge[1]]
-            relationship = self.create_neo4j_relationship(source, target, edge[2])
-            self.graph_4j.create(relationship)
+        self.create_neo4j_relationships(graph, load_id)
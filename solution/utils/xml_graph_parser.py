@@ -1,51 +1,153 @@
+import array
+import functools
 import itertools
+import multiprocessing
+import numpy as np
 import networkx as nx
-from xml.etree import ElementTree
-import xml.etree.ElementTree as ET
-from utils.graph_utils import export_graph_gexf
+from lxml import etree as LET
+from scipy.sparse import csr_array
+from typing import NamedTuple
+
+
+class GraphArrays(NamedTuple):
+    """
+    A directed graph stored as flat arrays, as produced by `XMLGraphParser.parse`. Node IDs are the positions in
+    `node_name` and `node_attr`, and edge `i` goes from `src[i]` to `dst[i]`. This layout is consumed directly by the
+    PageRank computation, the GEXF writer and the Neo4j import, without building a NetworkX graph.
+
+    Attributes:
+        node_name (list): The type of each node (`Protein`, `Gene`, `Reference`, ...).
+        node_attr (list): The attributes of each node, as dictionaries.
+        src (np.ndarray): The source node ID of each edge.
+        dst (np.ndarray): The target node ID of each edge.
+        edge_attr (list): The attributes of each edge, as dictionaries.
+    """
+
+    node_name: list
+    node_attr: list
+    src: np.ndarray
+    dst: np.ndarray
+    edge_attr: list
+
+    def to_csr(self) -> csr_array:
+        """
+        Builds the adjacency matrix of the graph in CSR format, with a weight of 1 per edge.
+
+        Returns:
+            csr_array: The `n x n` adjacency matrix, where `n` is the number of nodes.
+        """
+
+        n = len(self.node_name)
+        return csr_array((np.ones(len(self.src)), (self.src, self.dst)), shape=(n, n))
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Builds a NetworkX graph with the same nodes, edges and attributes, for the tools that need one (e.g. plotting).
+
+        Returns:
+            nx.DiGraph: The graph as a NetworkX directed graph.
+        """
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(
+            (node_id, {"name": name, **attributes})
+            for node_id, (name, attributes) in enumerate(zip(self.node_name, self.node_attr))
+        )
+        graph.add_edges_from(zip(self.src.tolist(), self.dst.tolist(), self.edge_attr))
+        return graph
+
 
 class XMLGraphParser:
     """
-    Parses an XML file containing protein information and generates a NetworkX graph representing the relationships
-    between different elements in the file.
+    Parses an XML file containing protein information and generates a graph representing the relationships between
+    different elements in the file, stored as flat arrays (`GraphArrays`).
 
     Args:
         xml_file (str): The path to the XML file to parse.
+        processes (int): The number of worker processes used to parse the entries of the file.
 
     Attributes:
-        graph (nx.Graph): The NetworkX graph representing the parsed information.
+        node_name (list): The type of each node collected while parsing, indexed by node ID.
+        node_attr (list): The attributes of each node collected while parsing, indexed by node ID.
+        _edge_src (array.array): The source node IDs of the edges collected while parsing.
+        _edge_dst (array.array): The target node IDs of the edges collected while parsing.
+        _edge_attr (list): The attributes of the edges collected while parsing.
         xml_file (str): The path to the XML file being parsed.
-        node_id (itertools.count): An iterator that generates unique node IDs for the graph.
-        root (ElementTree.Element): The root element of the XML file being parsed.
-        ns (dict): A dictionary mapping the 'uniprot' namespace to its URL.
+        processes (int): The number of worker processes used to parse the entries of the file.
+        _next_id (int): The ID of the next node added to the graph.
+        _author_ids (dict): A dictionary mapping each author name to the ID of its node.
+        _citation_ids (dict): A dictionary mapping each citation signature to the ID of its reference node.
     """
+
+    # Namespace-qualified tags in Clark notation, matched directly against the tags of the elements
+    _NS = '{http://uniprot.org/uniprot}'
+    _TAG_ENTRY = _NS + 'entry'
+    _TAG_ACCESSION = _NS + 'accession'
+    _TAG_REFERENCE = _NS + 'reference'
+    _TAG_CITATION = _NS + 'citation'
+    _TAG_TITLE = _NS + 'title'
+    _TAG_AUTHOR_LIST = _NS + 'authorList'
+    _TAG_FEATURE = _NS + 'feature'
+    _TAG_GENE = _NS + 'gene'
+    _TAG_ORGANISM = _NS + 'organism'
+    _TAG_NAME = _NS + 'name'
+    _TAG_DB_REFERENCE = _NS + 'dbReference'
+
+    # Relative path of the full name lookup, resolved by `find` which stops at the first match
+    _PATH_FULL_NAME = f'./{_NS}protein/{_NS}recommendedName/{_NS}fullName'
+
+    # Edge attributes of each kind of edge, copied by `add_edge` so that every edge owns its attributes
+    _HAS_REFERENCE = {"attr": "HAS_REFERENCE"}
+    _HAS_AUTHOR = {"attr": "HAS_AUTHOR"}
+    _HAS_FULL_NAME = {"attr": "HAS_FULL_NAME"}
+    _FROM_PRIMARY_GENE = {"attr": "FROM_GENE", "status": "primary"}
+    _FROM_SYNONYM_GENE = {"attr": "FROM_GENE", "status": "synonym"}
+    _IN_ORGANISM = {"attr": "IN_ORGANISM"}
+
+    # Approximate size in bytes of the part of the file parsed by a worker process at once, when parsing with several
+    # processes. Each part is extended to the start of the next protein, so parts always hold whole proteins.
+    bytes_per_chunk = 8 * 1024 * 1024
+
+    # Size of the blocks read from the file when looking for the start of a protein or feeding a worker's parser
+    _read_size = 1024 * 1024
     
-    def __init__(self, xml_file:str) -> None:
+    def __init__(self, xml_file:str, processes:int = 1) -> None:
         """
-        Initializes a new instance of the XMLGraphParser class. The method sets up the graph, loads the XML file
-        specified by the `xml_file` parameter, and sets up the default namespace.
+        Initializes a new instance of the XMLGraphParser class. The method sets up the node and edge buffers and stores
+        the path of the XML file specified by the `xml_file` parameter. The file itself is only read, entry by entry, by
+        `parse`.
 
         Args:
             xml_file (str): The path to the XML file to be parsed.
+            processes (int): The number of worker processes used to parse the entries of the file. With the default
+                of 1, the entries are parsed in the current process.
 
         Returns:
             None
 
         Attributes:
-            graph (nx.Graph): A NetworkX graph object representing the parsed information.
+            node_name (list): The type of each node collected while parsing, indexed by node ID.
+            node_attr (list): The attributes of each node collected while parsing, indexed by node ID.
+            _edge_src (array.array): The source node IDs of the edges collected while parsing.
+            _edge_dst (array.array): The target node IDs of the edges collected while parsing.
+            _edge_attr (list): The attributes of the edges collected while parsing.
             xml_file (str): The path to the XML file being parsed.
-            node_id (itertools.count): An iterator that generates unique node IDs for the graph.
-            root (ElementTree.Element): The root element of the XML file being parsed.
-            ns (dict): A dictionary mapping the 'uniprot' namespace to its URL.
+            processes (int): The number of worker processes used to parse the entries of the file.
+            _next_id (int): The ID of the next node added to the graph.
+            _author_ids (dict): A dictionary mapping each author name to the ID of its node.
+            _citation_ids (dict): A dictionary mapping each citation signature to the ID of its reference node.
         """
             
-        self.graph = nx.DiGraph()
+        self.node_name = []
+        self.node_attr = []
+        self._edge_src = array.array('i')
+        self._edge_dst = array.array('i')
+        self._edge_attr = []
         self.xml_file = xml_file
-        self.node_id = itertools.count()
-        self.root = ET.parse(self.xml_file).getroot()
-        
-        # Register default namespace
-        self.ns = {'uniprot': 'http://uniprot.org/uniprot'}
+        self.processes = processes
+        self._next_id = 0
+        self._author_ids = {}
+        self._citation_ids = {}
 
         
     def generate_node_id(self) -> int:
@@ -61,81 +163,168 @@ class XMLGraphParser:
 
         """
         
-        return next(self.node_id)
+        node_id = self._next_id
+        self._next_id += 1
+        return node_id
+
+
+    def generate_node_ids(self, count: int) -> range:
+        """
+        Reserves `count` consecutive IDs for nodes in the graph at once, for elements whose number is known up front.
+
+        Args:
+            count (int): The number of IDs to reserve.
+
+        Returns:
+            range: The reserved IDs, in sequence.
+        """
+
+        node_ids = range(self._next_id, self._next_id + count)
+        self._next_id += count
+        return node_ids
 
     
-    def parse_protein_id(self, entry: ElementTree) -> None:
+    def add_node(self, node_id: int, name: str, attributes: dict) -> None:
+        """
+        Records a node of the graph. Nodes are stored by position, so they have to be added in the order of the IDs
+        handed out by `generate_node_id` and `generate_node_ids`: `node_id` must be the position of the new node.
+
+        Args:
+            node_id (int): The ID of the node.
+            name (str): The type of the node.
+            attributes (dict): The attributes of the node.
+
+        Returns:
+            None
+        """
+
+        assert node_id == len(self.node_name), f"Node {node_id} added out of order at position {len(self.node_name)}"
+        self.node_name.append(name)
+        self.node_attr.append(attributes)
+
+
+    def add_edge(self, source: int, target: int, attributes: dict) -> None:
+        """
+        Records an edge of the graph. The endpoints are stored in compact integer arrays and a copy of the attributes in
+        a parallel list, so that updating the attributes of an edge never affects the other edges.
+
+        Args:
+            source (int): The ID of the source node.
+            target (int): The ID of the target node.
+            attributes (dict): The attributes of the edge.
+
+        Returns:
+            None
+        """
+
+        self._edge_src.append(source)
+        self._edge_dst.append(target)
+        self._edge_attr.append(dict(attributes))
+
+
+    def parse_protein_id(self, entry: LET._Element) -> str:
         """
         Parses a protein's ID from an XML element and returns it as a string. The method takes an `entry` argument, which
-        is an `ElementTree` object representing a protein in the XML file. The method searches for the first `accession`
-        element within the `entry` object, which should contain the protein's ID. If an `accession` element is found, the
-        method returns its text value. Otherwise, the method raises an `Exception`.
+        is an `lxml` element representing a protein in the XML file. The method takes the first `accession` child
+        of the `entry` object, which should contain the protein's ID, without looking at the following ones. If an
+        `accession` element is found, the method returns its text value. Otherwise, the method raises a `ValueError`.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
 
         Returns:
             str: The protein's ID.
 
         Raises:
-            Exception: If no `accession` element is found in the `entry` object.
+            ValueError: If no `accession` element is found in the `entry` object.
         """
             
-        accessions = entry.findall(".//uniprot:accession", self.ns)
-        if len(accessions) > 0:
-            return accessions[0].text
-        else:
-            raise Exception
+        accession = next(entry.iterchildren(self._TAG_ACCESSION), None)
+        if accession is None:
+            raise ValueError("No accession found in the protein entry")
+        return accession.text
 
             
-    def parse_references(self, entry: ElementTree, parent:str) -> None:
+    def parse_references(self, entry: LET._Element, parent:str) -> None:
         """
         Parses references for a given protein from an XML element and adds them to the graph. The method takes two
-        arguments: `entry`, an `ElementTree` object representing a protein in the XML file, and `parent`, a string
+        arguments: `entry`, an `lxml` element representing a protein in the XML file, and `parent`, a string
         representing the ID of the parent node in the graph to which the references should be added.
 
         For each reference element in `entry`, the method creates a new node in the graph with the name `Reference`
-        and attributes derived from the `citation` element within the reference. The method then adds an edge to the graph
-        connecting the reference node to the parent node, with an attribute indicating that the parent node has a
-        reference to the reference node. The method then searches for `authorList` elements within the reference, and
-        for each author, it creates a new node in the graph with the name `Author` and an attribute for the author's
-        name. The method then adds an edge to the graph connecting the reference node to the author node, with an
-        attribute indicating that the reference node has an author.
+        and one `citation_`-prefixed attribute per attribute of the `citation` element within the reference. The method
+        then adds an edge to the graph connecting the reference node to the parent node, with an attribute indicating
+        that the parent node has a reference to the reference node. The method then searches for `authorList` elements
+        within the reference, and for each author, it creates a new node in the graph with the name `Author` and an
+        attribute for the author's name. The method then adds an edge to the graph connecting the reference node to the
+        author node, with an attribute indicating that the reference node has an author.
+
+        References and authors are shared across proteins: a citation with the same attributes, title, authors (in
+        order) and database references, or an author with the same name, reuses the node created the first time it was
+        found. A reused reference is only linked to the parent node, since its authors were already added. A citation
+        without an `authorList` adds no authors.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
             parent (str): A string representing the ID of the parent node in the graph to which the references should
                 be added.
 
         Returns:
             None
+
+        Raises:
+            ValueError: If a `reference` element has no `citation` element.
         """
         
-        references = entry.findall(".//uniprot:reference", self.ns)
-        for ref in references:
-            citation = ref.find(".//uniprot:citation", self.ns)
-            ref_node_id = self.generate_node_id()
-            self.graph.add_node(ref_node_id, name="Reference", attr="\n".join([f"{key}: {value}" for key, value in citation.attrib.items()]))
-            self.graph.add_edge(parent, ref_node_id, attr="HAS_REFERENCE")
-            author_list = ref.find(".//uniprot:authorList", self.ns)
-            for author in author_list:
-                author_node_id = self.generate_node_id()
-                self.graph.add_node(author_node_id, name="Author", attr=f"name: {author.get('name')}")
-                self.graph.add_edge(ref_node_id, author_node_id, attr="HAS_AUTHOR")
-
+        for ref in entry.iterchildren(self._TAG_REFERENCE):
+            citation = next(ref.iterchildren(self._TAG_CITATION), None)
+            if citation is None:
+                raise ValueError("No citation found in a reference of the protein entry")
+            title = next(citation.iterchildren(self._TAG_TITLE), None)
+            author_list = next(citation.iterchildren(self._TAG_AUTHOR_LIST), None)
+            author_names = () if author_list is None else tuple(author.get('name') for author in author_list)
+            db_references = tuple(
+                (db_reference.get('type'), db_reference.get('id'))
+                for db_reference in citation.iterchildren(self._TAG_DB_REFERENCE)
+            )
+            # Untitled citations, such as submissions, are only told apart by their authors and database references
+            citation_key = (
+                tuple(sorted(citation.attrib.items())),
+                None if title is None else title.text,
+                author_names,
+                db_references,
+            )
+            ref_node_id = self._citation_ids.get(citation_key)
+            if ref_node_id is not None:
+                self.add_edge(parent, ref_node_id, self._HAS_REFERENCE)
+                continue
 
-    def parse_feature(self, entry: ElementTree, parent:str) -> None:
+            ref_node_id = self.generate_node_id()
+            self._citation_ids[citation_key] = ref_node_id
+            self.add_node(ref_node_id, "Reference", {f"citation_{key}": value for key, value in citation.attrib.items()})
+            self.add_edge(parent, ref_node_id, self._HAS_REFERENCE)
+            for author_name in author_names:
+                author_node_id = self._author_ids.get(author_name)
+                if author_node_id is None:
+                    author_node_id = self.generate_node_id()
+                    self._author_ids[author_name] = author_node_id
+                    self.add_node(author_node_id, "Author", {"author_name": author_name})
+                self.add_edge(ref_node_id, author_node_id, self._HAS_AUTHOR)
+
+
+    def parse_feature(self, entry: LET._Element, parent:str) -> None:
         """
         Parses features for a given protein from an XML element and adds them to the graph. The method takes two
-        arguments: `entry`, an `ElementTree` object representing a protein in the XML file, and `parent`, a string
+        arguments: `entry`, an `lxml` element representing a protein in the XML file, and `parent`, a string
         representing the ID of the parent node in the graph to which the features should be added.
 
         For each `feature` element in `entry`, the method creates a new node in the graph with the name `Feature` and
-        attributes derived from the `feature` element. The method then adds an edge to the graph connecting the feature
-        node to the parent node, with an attribute indicating that the parent node has a feature.
+        one `feature_`-prefixed attribute per attribute of the `feature` element. The method then adds an edge to the
+        graph connecting the feature node to the parent node, with an attribute indicating that the parent node has a
+        feature.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
             parent (str): A string representing the ID of the parent node in the graph to which the features should
                 be added.
 
@@ -143,17 +332,16 @@ class XMLGraphParser:
             None
         """
         
-        features = entry.findall(".//uniprot:feature", self.ns)
-        for fet in features:
-            ft_node_id = self.generate_node_id()
-            self.graph.add_node(ft_node_id, name="Feature", attr="\n".join([f"{key}: {value}" for key, value in fet.attrib.items()]))
-            self.graph.add_edge(parent, ft_node_id, attr="HAS_REFERENCE")
+        features = list(entry.iterchildren(self._TAG_FEATURE))
+        for ft_node_id, fet in zip(self.generate_node_ids(len(features)), features):
+            self.add_node(ft_node_id, "Feature", {f"feature_{key}": value for key, value in fet.attrib.items()})
+            self.add_edge(parent, ft_node_id, self._HAS_REFERENCE)
             
             
-    def parse_full_name(self, entry: ElementTree, parent:str) -> None:
+    def parse_full_name(self, entry: LET._Element, parent:str) -> None:
         """
         Parses a full name for a given protein from an XML element and adds it to the graph. The method takes two
-        arguments: `entry`, an `ElementTree` object representing a protein in the XML file, and `parent`, a string
+        arguments: `entry`, an `lxml` element representing a protein in the XML file, and `parent`, a string
         representing the ID of the parent node in the graph to which the full name should be added.
 
         If a `fullName` element is found within the `entry` object under `recommendedName`, the method creates a new
@@ -162,7 +350,7 @@ class XMLGraphParser:
         has a full name.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
             parent (str): A string representing the ID of the parent node in the graph to which the full name should
                 be added.
 
@@ -170,83 +358,70 @@ class XMLGraphParser:
             None
         """
 
-        full_name = self.root.find('.//uniprot:protein/uniprot:recommendedName/uniprot:fullName', self.ns)
+        full_name = entry.find(self._PATH_FULL_NAME)
         if full_name is not None:
             full_name_node_id = self.generate_node_id()
-            self.graph.add_node(full_name_node_id, name="FullName", attr=f"name: {full_name.text}")
-            self.graph.add_edge(parent, full_name_node_id, attr="HAS_FULL_NAME")
+            self.add_node(full_name_node_id, "FullName", {"full_name": full_name.text})
+            self.add_edge(parent, full_name_node_id, self._HAS_FULL_NAME)
             
             
-    def parse_primary_name(self, entry: ElementTree, parent:str) -> None:
+    def parse_gene_names(self, entry: LET._Element, parent:str) -> None:
         """
-        Parses a primary name for a given protein from an XML element and adds it to the graph. The method takes two
-        arguments: `entry`, an `ElementTree` object representing a protein in the XML file, and `parent`, a string
-        representing the ID of the parent node in the graph to which the primary name should be added.
+        Parses the primary and synonym names of the gene of a given protein from an XML element and adds them to the
+        graph. The method takes two arguments: `entry`, an `lxml` element representing a protein in the XML file, and
+        `parent`, a string representing the ID of the parent node in the graph to which the gene names should be added.
 
-        If a `name` element with `type="primary"` is found within the `gene` element under `uniprot`, the method
-        creates a new node in the graph with the name `Gene` and an attribute for the primary name. The method then adds
-        an edge to the graph connecting the gene node to the parent node, with an attribute indicating that the gene node
-        comes from the primary name of the protein.
+        The `name` children of the `gene` elements are read in a single pass and split on their `type` attribute. If a
+        `name` element with `type="primary"` is found, the method creates a new node in the graph with the name `Gene`
+        and an attribute for the primary name, connected to the parent node by an edge indicating that the gene node
+        comes from the primary name of the protein. For each `name` element with `type="synonym"`, the method then
+        creates a `Gene` node in the same way, connected by an edge indicating that it comes from a synonym name.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
-            parent (str): A string representing the ID of the parent node in the graph to which the primary name should
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
+            parent (str): A string representing the ID of the parent node in the graph to which the gene names should
                 be added.
 
         Returns:
             None
         """
 
-        primary_name = self.root.find('.//uniprot:gene/uniprot:name[@type="primary"]', self.ns)
+        primary_name = None
+        synonym_names = []
+        for gene in entry.iterchildren(self._TAG_GENE):
+            for name in gene.iterchildren(self._TAG_NAME):
+                name_type = name.get('type')
+                if name_type == 'primary':
+                    if primary_name is None:
+                        primary_name = name.text
+                elif name_type == 'synonym':
+                    synonym_names.append(name.text)
+
         if primary_name is not None:
             gene_pri_node_id = self.generate_node_id()
-            self.graph.add_node(gene_pri_node_id, name="Gene", attr=f"name: {primary_name.text}")
-            self.graph.add_edge(parent, gene_pri_node_id, attr=f"FROM_GENE\nstatus: primary")
-            
-            
-    def parse_synonym_name(self, entry: ElementTree, parent:str) -> None:
-        """
-        Parses synonym names for a given protein from an XML element and adds them to the graph. The method takes two
-        arguments: `entry`, an `ElementTree` object representing a protein in the XML file, and `parent`, a string
-        representing the ID of the parent node in the graph to which the synonym names should be added.
-
-        For each `name` element with `type="synonym"` found within the `gene` element under `uniprot`, the method
-        creates a new node in the graph with the name `Gene` and an attribute for the synonym name. The method then adds
-        an edge to the graph connecting the gene node to the parent node, with an attribute indicating that the gene node
-        comes from a synonym name of the protein.
-
-        Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
-            parent (str): A string representing the ID of the parent node in the graph to which the synonym names should
-                be added.
+            self.add_node(gene_pri_node_id, "Gene", {"gene_name": primary_name})
+            self.add_edge(parent, gene_pri_node_id, self._FROM_PRIMARY_GENE)
 
-        Returns:
-            None
-        """
-        
-        synonym_names = self.root.findall('.//uniprot:gene/uniprot:name[@type="synonym"]', self.ns)
-        if synonym_names:
-            for synonym_name in synonym_names:
-                gene_sec_node_id = self.generate_node_id()
-                self.graph.add_node(gene_sec_node_id, name="Gene", attr=f"name: {synonym_name.text}")
-                self.graph.add_edge(parent, gene_sec_node_id, attr="FROM_GENE\nstatus: synonym")
+        for gene_sec_node_id, synonym_name in zip(self.generate_node_ids(len(synonym_names)), synonym_names):
+            self.add_node(gene_sec_node_id, "Gene", {"gene_name": synonym_name})
+            self.add_edge(parent, gene_sec_node_id, self._FROM_SYNONYM_GENE)
             
             
-    def parse_scientific_name(self, entry: ElementTree, parent:str) -> None:
+    def parse_scientific_name(self, entry: LET._Element, parent:str) -> None:
         """
         Parses a scientific name and corresponding taxonomy ID for a given protein from an XML element and adds them to
-        the graph. The method takes two arguments: `entry`, an `ElementTree` object representing a protein in the XML
+        the graph. The method takes two arguments: `entry`, an `lxml` element representing a protein in the XML
         file, and `parent`, a string representing the ID of the parent node in the graph to which the scientific name
         and taxonomy ID should be added.
 
-        The method searches for a `name` element within the `organism` element under `uniprot` with an attribute
+        The method reads the children of the `organism` element once, looking for a `name` element with an attribute
         `type="scientific"`, as well as a `dbReference` element with an attribute `type="NCBI Taxonomy"`. If both
         elements are found, it creates a new node in the graph with the name `Organism` and attributes for the
         scientific name and taxonomy ID. The method then adds an edge to the graph connecting the organism node to the
         parent node, with an attribute indicating that the organism node is part of the protein.
 
         Args:
-            entry (ElementTree): An `ElementTree` object representing a protein in the XML file.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
             parent (str): A string representing the ID of the parent node in the graph to which the scientific name and
                 taxonomy ID should be added.
 
@@ -254,26 +429,34 @@ class XMLGraphParser:
             None
         """
         
-        scientific_name = self.root.find('.//uniprot:organism/uniprot:name[@type="scientific"]', self.ns)
-        ncbi_taxonomy_id = self.root.find('.//uniprot:organism/uniprot:dbReference[@type="NCBI Taxonomy"]', self.ns)
+        organism = next(entry.iterchildren(self._TAG_ORGANISM), None)
+        if organism is None:
+            return
+
+        scientific_name = None
+        ncbi_taxonomy_id = None
+        for child in organism:
+            if child.tag == self._TAG_NAME:
+                if scientific_name is None and child.get('type') == 'scientific':
+                    scientific_name = child.text
+            elif child.tag == self._TAG_DB_REFERENCE:
+                if ncbi_taxonomy_id is None and child.get('type') == 'NCBI Taxonomy':
+                    ncbi_taxonomy_id = child.get('id')
+
         if None not in [scientific_name, ncbi_taxonomy_id]:
             org_node_id = self.generate_node_id()
-            self.graph.add_node(
-                org_node_id,
-                name="Organism",
-                attr=f"name: {scientific_name.text}\ntaxonomy_id: {ncbi_taxonomy_id.get('id')}"
-            )
-            self.graph.add_edge(
-                parent, 
+            self.add_node(
                 org_node_id,
-                attr="IN_ORGANISM"
+                "Organism",
+                {"scientific_name": scientific_name, "taxonomy_id": ncbi_taxonomy_id}
             )
+            self.add_edge(parent, org_node_id, self._IN_ORGANISM)
 
             
-    def parse_protein(self, entry:str) -> None:
+    def parse_protein(self, entry: LET._Element) -> None:
         """
         Parses the attributes and related elements of an XML element of a protein, adding them as nodes and edges to the
-        graph. The method takes a string argument `entry` representing an XML element of a protein.
+        graph. The method takes an `lxml` element argument `entry` representing an XML element of a protein.
 
         The method first generates a new ID for the protein node and adds it to the graph with the name `Protein` and an
         attribute for the protein ID obtained using the `parse_protein_id` method. It then calls methods to parse and
@@ -281,7 +464,7 @@ class XMLGraphParser:
         references, and features.
 
         Args:
-            entry (str): A string representing an XML element of a protein.
+            entry (LET._Element): An `lxml` element representing a protein in the XML file.
 
         Returns:
             None
@@ -289,16 +472,13 @@ class XMLGraphParser:
         
         # Find for protein refereces
         protein_node_id = self.generate_node_id()
-        self.graph.add_node(protein_node_id, name="Protein", attr=f"id: {self.parse_protein_id(entry)}")
+        self.add_node(protein_node_id, "Protein", {"accession": self.parse_protein_id(entry)})
 
         # Find for full name refereces
         self.parse_full_name(entry, protein_node_id)
 
-        # Find for genes references
-        self.parse_primary_name(entry, protein_node_id)
-
-        # Extract synonym names references
-        self.parse_synonym_name(entry, protein_node_id)
+        # Find for primary and synonym genes references
+        self.parse_gene_names(entry, protein_node_id)
 
         # Find for organism references
         self.parse_scientific_name(entry, protein_node_id)
@@ -310,17 +490,208 @@ class XMLGraphParser:
         self.parse_feature(entry, protein_node_id)
 
         
-    def parse(self) -> nx.Graph:
+    def iter_entries(self):
+        """
+        Streams the XML elements of the proteins in the XML file with `lxml.etree.iterparse`, yielding each one as soon
+        as it has been read. Once the caller is done with an element, it is released together with its already
+        processed siblings, so that only one protein is held in memory at a time. Entities declared in the file are not
+        resolved and nothing is fetched from the network, so a DTD in the file cannot read local files.
+
+        Yields:
+            LET._Element: An XML element of a protein.
+        """
+
+        for _, entry in LET.iterparse(
+            self.xml_file, tag=self._TAG_ENTRY, resolve_entities=False, no_network=True
+        ):
+            yield entry
+            _release_entry(entry)
+
+
+    def find_entry_start(self, xml_file, offset: int) -> int:
         """
-        Parses the entire XML file and builds a graph representation of the data. The method iterates over each XML element
-        of a protein in the root of the XML file and calls the `parse_protein` method to parse and add its attributes and
-        related elements to the graph. After parsing all proteins, the method returns the resulting graph object.
+        Finds the byte offset of the first `entry` start tag at or after `offset` in the XML file. The tag is looked up
+        as raw bytes, which relies on the proteins being written as `<entry` elements of the default namespace, as in
+        the UniProt files, and on no such tag appearing inside a comment or a CDATA section.
+
+        Args:
+            xml_file: The XML file, opened in binary mode.
+            offset (int): The byte offset the search starts from.
 
         Returns:
-            nx.Graph: A graph object representing the parsed data.
+            int: The byte offset of the start tag, or -1 if there is no protein after `offset`.
+        """
+
+        tag = b'<entry'
+        xml_file.seek(offset)
+        block = b''
+        while chunk := xml_file.read(self._read_size):
+            block += chunk
+            position = block.find(tag)
+            while position != -1 and position + len(tag) < len(block):
+                if block[position + len(tag)] in b' \t\r\n>':
+                    return offset + position
+                position = block.find(tag, position + 1)
+            # Keep the end of the block, which may hold the beginning of a tag cut by the read
+            kept = min(len(tag), len(block)) if position == -1 else len(block) - position
+            offset += len(block) - kept
+            block = block[-kept:]
+        return -1
+
+
+    def iter_chunks(self):
+        """
+        Splits the XML file into byte ranges of about `bytes_per_chunk` bytes, each one starting at a protein, so they
+        can be parsed by worker processes. Only the start of each range is read, to find the next protein.
+
+        Yields:
+            tuple: The byte offset where the proteins of the file start, which is also the length of the header holding
+                the root element, followed by the start and end byte offsets of a range.
+        """
+
+        with open(self.xml_file, 'rb') as xml_file:
+            header_end = self.find_entry_start(xml_file, 0)
+            if header_end == -1:
+                return
+            size = xml_file.seek(0, 2)
+            start = header_end
+            while start != -1:
+                end = self.find_entry_start(xml_file, start + self.bytes_per_chunk)
+                yield header_end, start, size if end == -1 else end
+                start = end
+
+
+    def merge(
+        self, node_name: list, node_attr: list, edge_src: array.array, edge_dst: array.array, edge_attr: list,
+        author_ids: dict, citation_ids: dict
+    ) -> None:
+        """
+        Adds the nodes and edges parsed by a worker process to this parser. The worker numbers its nodes from 0, so the
+        node IDs are shifted past the nodes of this parser with NumPy. Authors and references already known to this
+        parser are mapped to their existing nodes instead, and the edges going out of them are dropped, as they were
+        added when the node was first created. Merging the results in file order thus yields the same graph as parsing
+        the whole file in a single process.
+
+        Args:
+            node_name (list): The type of each node parsed by the worker.
+            node_attr (list): The attributes of each node parsed by the worker.
+            edge_src (array.array): The source node IDs of the edges parsed by the worker.
+            edge_dst (array.array): The target node IDs of the edges parsed by the worker.
+            edge_attr (list): The attributes of the edges parsed by the worker.
+            author_ids (dict): The worker's mapping of author names to node IDs.
+            citation_ids (dict): The worker's mapping of citation signatures to node IDs.
+
+        Returns:
+            None
+        """
+
+        node_ids = np.arange(len(node_name))
+        kept = np.ones(len(node_name), dtype=bool)
+        new_keys = []
+        for known_ids, worker_ids in ((self._author_ids, author_ids), (self._citation_ids, citation_ids)):
+            for key, node_id in worker_ids.items():
+                known_id = known_ids.get(key)
+                if known_id is None:
+                    new_keys.append((known_ids, key, node_id))
+                else:
+                    node_ids[node_id] = known_id
+                    kept[node_id] = False
+
+        node_ids[kept] = self.generate_node_ids(int(kept.sum()))
+        for known_ids, key, node_id in new_keys:
+            known_ids[key] = int(node_ids[node_id])
+
+        src = np.frombuffer(edge_src, dtype=np.int32)
+        dst = np.frombuffer(edge_dst, dtype=np.int32)
+        edge_kept = kept[src]
+        self.node_name.extend(itertools.compress(node_name, kept))
+        self.node_attr.extend(itertools.compress(node_attr, kept))
+        self._edge_src.frombytes(node_ids[src[edge_kept]].astype(np.int32).tobytes())
+        self._edge_dst.frombytes(node_ids[dst[edge_kept]].astype(np.int32).tobytes())
+        self._edge_attr.extend(itertools.compress(edge_attr, edge_kept))
+
+
+    def parse(self) -> GraphArrays:
+        """
+        Parses the entire XML file and builds a graph representation of the data. The method streams the XML elements
+        of the proteins with `iter_entries` and calls the `parse_protein` method for each of them. When `processes` is
+        greater than 1, the file is instead split into byte ranges with `iter_chunks`, each one read and parsed by a
+        worker process of a pool, and their results are merged in file order with `merge`. Once all proteins have been
+        parsed, the collected nodes and edges are returned as flat arrays, the edge endpoints being exposed to NumPy
+        without a copy.
+
+        Returns:
+            GraphArrays: The graph representing the parsed data.
         """
         
-        for entry in self.root.findall(".//uniprot:entry", self.ns):
-            self.parse_protein(entry)
+        if self.processes > 1:
+            # Workers are spawned rather than forked, as the process may already run threads (e.g. Numba's)
+            with multiprocessing.get_context('spawn').Pool(self.processes) as pool:
+                for result in pool.imap(functools.partial(_parse_chunk, self.xml_file), self.iter_chunks()):
+                    self.merge(*result)
+        else:
+            for entry in self.iter_entries():
+                self.parse_protein(entry)
         
-        return self.graph
+        return GraphArrays(
+            self.node_name,
+            self.node_attr,
+            np.frombuffer(self._edge_src, dtype=np.int32),
+            np.frombuffer(self._edge_dst, dtype=np.int32),
+            self._edge_attr,
+        )
+
+
+def _release_entry(entry: LET._Element) -> None:
+    """
+    Releases a processed XML element of a protein, together with its already processed siblings.
+
+    Args:
+        entry (LET._Element): An `lxml` element representing a protein in the XML file.
+
+    Returns:
+        None
+    """
+
+    entry.clear()
+    while entry.getprevious() is not None:
+        del entry.getparent()[0]
+
+
+def _parse_chunk(xml_file: str, chunk: tuple) -> tuple:
+    """
+    Parses the proteins of a byte range of the XML file in a worker process. The header of the file, which opens the
+    root element and declares the namespaces, is fed to an `lxml` pull parser before the range itself, which is read
+    block by block. The node IDs of the returned nodes and edges start from 0 and are shifted by
+    `XMLGraphParser.merge` in the parent process.
+
+    Args:
+        xml_file (str): The path to the XML file to parse.
+        chunk (tuple): The length of the header of the file and the start and end byte offsets of the range, as
+            yielded by `XMLGraphParser.iter_chunks`.
+
+    Returns:
+        tuple: The types and attributes of the nodes and the source IDs, target IDs and attributes of the edges parsed
+            from the range, followed by the author and citation mappings of the worker.
+    """
+
+    header_end, start, end = chunk
+    parser = XMLGraphParser(xml_file)
+    pull_parser = LET.XMLPullParser(
+        events=('end',), tag=XMLGraphParser._TAG_ENTRY, resolve_entities=False, no_network=True
+    )
+    with open(xml_file, 'rb') as file:
+        pull_parser.feed(file.read(header_end))
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(remaining, parser._read_size))
+            remaining -= len(block)
+            pull_parser.feed(block)
+            for _, entry in pull_parser.read_events():
+                parser.parse_protein(entry)
+                _release_entry(entry)
+    return (
+        parser.node_name, parser.node_attr, parser._edge_src, parser._edge_dst, parser._edge_attr, parser._author_ids,
+        parser._citation_ids
+    )